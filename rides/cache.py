@@ -0,0 +1,186 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class LRUCache:
+    """
+    Caché en memoria del proceso con tamaño acotado y desalojo LRU.
+
+    Lleva contadores de aciertos/fallos para poder medir su efectividad.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+
+class _Flight:
+    def __init__(self, generation):
+        self.generation = generation
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Agrupa llamadas concurrentes con la misma clave en una sola ejecución.
+
+    La primera llamada (líder) ejecuta la función y las que llegan mientras
+    está en curso esperan su resultado (o su excepción), como mucho
+    `wait_timeout` segundos. Los resultados correctos se reutilizan durante
+    `ttl` segundos, con un máximo de `max_entries`; los errores no se guardan.
+    """
+
+    def __init__(self, ttl, max_entries=256, wait_timeout=10):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._flights = {}
+        # clave -> (expira, resultado). Con un ttl fijo el orden de inserción
+        # es también el orden de expiración.
+        self._results = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+        self.timeouts = 0
+
+    def do(self, key, func):
+        with self._lock:
+            self._evict_expired()
+            cached = self._results.get(key)
+            if cached is not None:
+                self.shared += 1
+                return cached[1]
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight(self._generation)
+                self.leaders += 1
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            if not flight.done.wait(self.wait_timeout):
+                # El líder no termina: se calcula sin esperarlo.
+                with self._lock:
+                    self.timeouts += 1
+                return func()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                if flight.error is None and flight.generation == self._generation:
+                    self._store(key, flight.result)
+            flight.done.set()
+        return flight.result
+
+    def invalidate(self):
+        """
+        Descarta los resultados guardados. Las ejecuciones en curso terminan,
+        pero sus resultados sólo se entregan a quienes ya las esperaban.
+        """
+        with self._lock:
+            self._generation += 1
+            self._flights.clear()
+            self._results.clear()
+
+    def _store(self, key, result):
+        if self.ttl <= 0:
+            return
+        self._results[key] = (time.monotonic() + self.ttl, result)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        while self._results:
+            key, (expires_at, _) = next(iter(self._results.items()))
+            if expires_at > now:
+                break
+            del self._results[key]
+
+    def clear(self):
+        self.invalidate()
+        with self._lock:
+            self.leaders = self.shared = self.timeouts = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'in_flight': len(self._flights),
+                'results': len(self._results),
+                'max_entries': self.max_entries,
+                'leaders': self.leaders,
+                'shared': self.shared,
+                'timeouts': self.timeouts,
+            }
+
+
+# Representaciones serializadas por objeto (ver serializers.VersionedFragmentMixin).
+fragment_cache = LRUCache(getattr(settings, 'RIDES_FRAGMENT_CACHE_SIZE', 10000))
+
+# Respuestas de listados GET compartidas entre requests idénticos
+# (ver views.CoalescedListMixin).
+list_coalescer = SingleFlight(
+    getattr(settings, 'RIDES_COALESCE_TTL', 0.5),
+    max_entries=getattr(settings, 'RIDES_COALESCE_MAX_ENTRIES', 256),
+)
@@ -0,0 +1,90 @@
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from rides.cache import list_coalescer
+from rides.views import DriverViewSet, TripViewSet
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Simula ráfagas de requests GET idénticos y concurrentes a '
+        '/api/trips/?driver=<id> y /api/drivers/, y compara las consultas '
+        'a la base de datos con y sin coalescencia.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=200)
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(is_driver=True).first()
+        if user is None:
+            raise CommandError('Se necesita al menos un conductor (python manage.py migrate).')
+
+        factory = APIRequestFactory()
+        endpoints = [
+            (f'/api/trips/?driver={user.pk}', TripViewSet.as_view({'get': 'list'})),
+            ('/api/drivers/', DriverViewSet.as_view({'get': 'list'})),
+        ]
+        clients = options['clients']
+
+        self.stdout.write(f'{clients} clientes concurrentes por endpoint')
+        self.stdout.write(f'{"coalescencia":<14} {"consultas":>10} {"tiempo s":>9}')
+        for enabled in (False, True):
+            list_coalescer.clear()
+            with override_settings(RIDES_COALESCE_LISTS=enabled):
+                queries, elapsed = self._burst(factory, endpoints, user, clients)
+            label = 'sí' if enabled else 'no'
+            self.stdout.write(f'{label:<14} {queries:>10} {elapsed:>9.2f}')
+        self.stdout.write(f'single-flight: {list_coalescer.stats()}')
+
+    def _burst(self, factory, endpoints, user, clients):
+        barrier = threading.Barrier(clients * len(endpoints))
+        counts = []
+        lock = threading.Lock()
+
+        def client(url, view):
+            executed = []
+
+            def count(execute, sql, params, many, context):
+                executed.append(sql)
+                return execute(sql, params, many, context)
+
+            request = factory.get(url)
+            force_authenticate(request, user=user)
+            try:
+                with self._count_queries(count):
+                    barrier.wait()
+                    response = view(request)
+                    response.render()
+            finally:
+                connections.close_all()
+            with lock:
+                counts.append(len(executed))
+
+        threads = [
+            threading.Thread(target=client, args=endpoint)
+            for endpoint in endpoints
+            for _ in range(clients)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sum(counts), time.perf_counter() - start
+
+    def _count_queries(self, wrapper):
+        stack = ExitStack()
+        for alias in settings.DATABASES:
+            stack.enter_context(connections[alias].execute_wrapper(wrapper))
+        return stack
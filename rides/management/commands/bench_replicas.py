@@ -0,0 +1,69 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+
+from rides.models import Trip
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide lecturas por segundo de /api/trips/ (consulta equivalente) '
+        'usando 1..N réplicas de DATABASE_REPLICAS. '
+        'Ejemplo: DJANGO_DB_REPLICAS=4 python manage.py bench_replicas'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--reads', type=int, default=200,
+                            help='Lecturas por hilo.')
+
+    def handle(self, *args, **options):
+        replicas = list(settings.DATABASE_REPLICAS)
+        if not replicas:
+            raise CommandError('No hay réplicas configuradas (DJANGO_DB_REPLICAS=0).')
+
+        threads = options['threads']
+        reads = options['reads']
+        self.stdout.write(f'{"réplicas":>9} {"lecturas/s":>12} {"reparto"}')
+        baseline = None
+        for n in range(1, len(replicas) + 1):
+            with override_settings(
+                DATABASE_REPLICAS=replicas[:n],
+                DATABASE_ROUTERS=settings.DATABASE_ROUTERS,
+            ):
+                elapsed, used = self._run(threads, reads)
+            rate = threads * reads / elapsed
+            baseline = baseline or rate
+            spread = ', '.join(f'{alias}={count}' for alias, count in sorted(used.items()))
+            self.stdout.write(
+                f'{n:>9} {rate:>12.0f} {spread} (x{rate / baseline:.2f})'
+            )
+
+    def _run(self, threads, reads):
+        def worker(_):
+            used = {}
+            try:
+                for _ in range(reads):
+                    qs = Trip.objects.select_related('passenger', 'driver', 'rating')
+                    # Cada acceso a qs.db consulta al router: se resuelve una vez.
+                    alias = qs.db
+                    used[alias] = used.get(alias, 0) + 1
+                    list(qs.using(alias))
+            finally:
+                connections.close_all()
+            return used
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(worker, range(threads)))
+        elapsed = time.perf_counter() - start
+
+        totals = {}
+        for used in results:
+            for alias, count in used.items():
+                totals[alias] = totals.get(alias, 0) + count
+        return elapsed, totals
@@ -0,0 +1,91 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from rides.models import CustomUser, Rating, Trip
+from rides.search import icontains_ids, search_ids, tokenize
+
+WORDS = [
+    'amable', 'puntual', 'limpio', 'rapido', 'lento', 'ruido', 'musica',
+    'conductor', 'vehiculo', 'ruta', 'trafico', 'excelente', 'regular',
+    'tarde', 'seguro', 'comodo', 'aire', 'precio', 'educado', 'pesimo',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara /api/search/ (FTS5/tsvector) con filtros icontains sobre '
+        'Rating.comment. Los datos generados se descartan al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ratings', type=int, default=1_000_000)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--queries', nargs='+', default=['amab', 'puntual limp', 'zzz'],
+        )
+
+    def handle(self, *args, **options):
+        passenger = CustomUser.objects.first()
+        if passenger is None:
+            raise CommandError('Se necesita al menos un usuario (python manage.py migrate).')
+
+        with transaction.atomic():
+            self._populate(passenger, options['ratings'], options['batch_size'])
+            self.stdout.write(
+                f'{"consulta":<16} {"icontains ms":>13} {"fts ms":>9} {"aceleración":>12}'
+            )
+            # Las filas generadas sólo existen en esta transacción sin
+            # confirmar: hay que leerlas por la misma conexión, no por una
+            # réplica.
+            for query in options['queries']:
+                tokens = tokenize(query)
+                baseline = self._time(
+                    lambda: icontains_ids(Rating, tokens, 20, using=DEFAULT_DB_ALIAS),
+                    options['repeat'],
+                )
+                fts = self._time(
+                    lambda: search_ids(Rating, query, 20, using=DEFAULT_DB_ALIAS),
+                    options['repeat'],
+                )
+                self.stdout.write(
+                    f'{query:<16} {baseline * 1000:>13.1f} {fts * 1000:>9.1f} '
+                    f'{baseline / fts:>11.0f}x'
+                )
+            transaction.set_rollback(True)
+
+    def _populate(self, passenger, total, batch_size):
+        rng = random.Random(0)
+        # Vocabulario amplio para que cada palabra aparezca en pocas filas,
+        # como en comentarios reales.
+        syllables = ['ca', 'ro', 'ta', 'me', 'li', 'do', 'su', 'na', 've', 'go']
+        vocabulary = WORDS + [
+            ''.join(rng.choices(syllables, k=4)) for _ in range(2000)
+        ]
+        created = 0
+        while created < total:
+            size = min(batch_size, total - created)
+            trips = Trip.objects.bulk_create(
+                Trip(passenger=passenger, status=Trip.STATUS_COMPLETED)
+                for _ in range(size)
+            )
+            Rating.objects.bulk_create(
+                Rating(
+                    trip=trip,
+                    score=rng.randint(1, 5),
+                    comment=' '.join(rng.choices(vocabulary, k=rng.randint(3, 12))),
+                )
+                for trip in trips
+            )
+            created += size
+        self.stdout.write(f'{created} ratings generados.')
+
+    def _time(self, func, repeat):
+        func()  # calentamiento
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) / repeat
@@ -0,0 +1,335 @@
+import csv
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from rides.models import ImportCheckpoint, Rating, Trip
+
+User = get_user_model()
+
+STATUSES = {value for value, _ in Trip.STATUS_CHOICES}
+
+# Bytes del inicio del archivo que identifican su contenido.
+FINGERPRINT_BYTES = 64 * 1024
+
+
+class RowError(ValueError):
+    pass
+
+
+@contextmanager
+def historical_timestamps():
+    """
+    Desactiva auto_now_add en los campos de fecha de creación para conservar
+    las fechas originales de los viajes importados.
+    """
+    fields = [
+        Trip._meta.get_field('requested_at'),
+        Rating._meta.get_field('created_at'),
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa viajes históricos (y sus ratings) desde NDJSON o CSV. '
+        'Columnas: passenger_email, driver_email, requested_at, start_time, '
+        'end_time, status, score, comment. Se puede reanudar: el progreso se '
+        'guarda en ImportCheckpoint en la misma transacción de cada lote.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['ndjson', 'csv'],
+                            help='Por defecto se deduce de la extensión.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--rejects',
+                            help='Filas inválidas (NDJSON). Por defecto <path>.rejects.')
+        parser.add_argument('--restart', action='store_true',
+                            help='Borra los viajes ya importados desde este archivo, '
+                                 'el checkpoint y los rechazos, y empieza desde el inicio.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'No existe {path}.')
+        fmt = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        rejects_path = options['rejects'] or f'{path}.rejects'
+        batch_size = options['batch_size']
+
+        fingerprint = self._fingerprint(path)
+        checkpoint, created = ImportCheckpoint.objects.get_or_create(
+            source=os.path.abspath(path), defaults={'fingerprint': fingerprint},
+        )
+        if options['restart']:
+            self._restart(checkpoint, fingerprint, batch_size)
+            if os.path.exists(rejects_path):
+                os.remove(rejects_path)
+        elif (checkpoint.fingerprint != fingerprint
+              or os.path.getsize(path) < checkpoint.offset):
+            raise CommandError(
+                f'{path} cambió desde la importación anterior (línea {checkpoint.line}, '
+                f'{checkpoint.imported} importados). Usa --restart para borrar lo '
+                f'importado y empezar de nuevo.'
+            )
+        elif not created:
+            self.stdout.write(
+                f'Reanudando desde la línea {checkpoint.line} '
+                f'({checkpoint.imported} importados, {checkpoint.rejected} rechazados).'
+            )
+
+        self.verbosity = options['verbosity']
+        self.users, self.drivers = self._load_users()
+        self.default_tz = timezone.get_default_timezone()
+
+        with open(path, 'rb') as source, \
+                open(rejects_path, 'ab') as rejects, \
+                historical_timestamps():
+            # Descarta rechazos escritos por un lote que no llegó a confirmarse.
+            if os.path.getsize(rejects_path) > checkpoint.rejects_offset:
+                rejects.truncate(checkpoint.rejects_offset)
+                rejects.seek(0, os.SEEK_END)
+
+            batch, rejected = [], []
+            position = (checkpoint.offset, checkpoint.line)
+            rows = self._read(source, fmt, checkpoint.offset, checkpoint.line)
+            for row, error, line, offset in rows:
+                if error is None:
+                    try:
+                        batch.append(self._parse(row))
+                    except RowError as exc:
+                        error = str(exc)
+                if error is not None:
+                    rejected.append(self._reject(line, error, row))
+                position = (offset, line)
+
+                if len(batch) + len(rejected) >= batch_size:
+                    self._flush(checkpoint, batch, rejected, position, rejects)
+                    batch, rejected = [], []
+            self._flush(checkpoint, batch, rejected, position, rejects)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{checkpoint.imported} viajes importados, {checkpoint.rejected} rechazados '
+            f'(ver {rejects_path}).'
+        ))
+
+    def _fingerprint(self, path):
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read(FINGERPRINT_BYTES)).hexdigest()
+
+    def _restart(self, checkpoint, fingerprint, batch_size):
+        """
+        Borra por lotes los viajes (y sus ratings) importados con este
+        checkpoint y lo deja como nuevo.
+        """
+        trips = Trip.objects.using(DEFAULT_DB_ALIAS).filter(imported_from=checkpoint)
+        deleted = 0
+        while True:
+            ids = list(trips.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                Trip.objects.filter(pk__in=ids).delete()
+            deleted += len(ids)
+        if deleted:
+            self.stdout.write(f'{deleted} viajes importados anteriormente borrados.')
+
+        checkpoint.fingerprint = fingerprint
+        checkpoint.offset = checkpoint.line = checkpoint.rejects_offset = 0
+        checkpoint.imported = checkpoint.rejected = 0
+        checkpoint.save()
+
+    def _load_users(self):
+        # email -> id; los emails repetidos se marcan como ambiguos (None).
+        # Aparte, los ids de los conductores.
+        users, drivers = {}, set()
+        rows = User.objects.exclude(email='').values_list('pk', 'email', 'is_driver')
+        for pk, email, is_driver in rows.iterator():
+            email = email.lower()
+            users[email] = None if email in users else pk
+            if is_driver:
+                drivers.add(pk)
+        return users, drivers
+
+    def _read(self, source, fmt, offset, line):
+        """
+        Genera (fila, error, número de línea, offset en bytes tras la fila) a
+        partir de `offset`, leyendo el archivo línea a línea. `error` no es
+        None cuando la fila no se pudo leer (UTF-8 o CSV inválidos).
+        """
+        header = None
+        if fmt == 'csv':
+            header_line = source.readline()
+            header = next(csv.reader([header_line.decode('utf-8-sig')]))
+            if offset == 0:
+                offset, line = len(header_line), 1
+        source.seek(offset)
+
+        position = {'offset': offset, 'line': line, 'error': None}
+
+        def lines():
+            for raw in source:
+                position['offset'] += len(raw)
+                position['line'] += 1
+                try:
+                    yield raw.decode('utf-8')
+                except UnicodeDecodeError as exc:
+                    position['error'] = f'UTF-8 inválido: {exc.reason}'
+                    yield raw.decode('utf-8', errors='replace')
+
+        if fmt == 'csv':
+            # csv.reader consume sólo las líneas de cada registro, así que
+            # `position` apunta justo al final del registro devuelto.
+            reader = csv.reader(lines())
+            while True:
+                try:
+                    values = next(reader)
+                except StopIteration:
+                    return
+                except csv.Error as exc:
+                    # El lector descarta el registro y sigue con el siguiente.
+                    position['error'] = None
+                    yield None, f'CSV inválido: {exc}', position['line'], position['offset']
+                    continue
+                error, position['error'] = position['error'], None
+                if not values and error is None:
+                    continue
+                yield dict(zip(header, values)), error, position['line'], position['offset']
+        else:
+            for text in lines():
+                error, position['error'] = position['error'], None
+                if not text.strip() and error is None:
+                    continue
+                if error is not None:
+                    yield text.rstrip('\n'), error, position['line'], position['offset']
+                    continue
+                try:
+                    row = json.loads(text)
+                except ValueError:
+                    row = text.rstrip('\n')
+                yield row, None, position['line'], position['offset']
+
+    def _parse(self, row):
+        if not isinstance(row, dict):
+            raise RowError('JSON inválido')
+
+        passenger_id = self._user_id(row, 'passenger_email', required=True)
+        driver_id = self._user_id(row, 'driver_email', required=False)
+        if driver_id is not None:
+            if driver_id not in self.drivers:
+                raise RowError('driver_email no es conductor')
+            if driver_id == passenger_id:
+                raise RowError('el conductor no puede ser el pasajero')
+
+        status = str(row.get('status') or Trip.STATUS_PENDING).upper()
+        if status not in STATUSES:
+            raise RowError(f'status inválido: {status}')
+
+        requested_at = self._datetime(row, 'requested_at', required=True)
+        start_time = self._datetime(row, 'start_time')
+        end_time = self._datetime(row, 'end_time')
+        if start_time and end_time and end_time < start_time:
+            raise RowError('end_time anterior a start_time')
+
+        trip = Trip(
+            passenger_id=passenger_id,
+            driver_id=driver_id,
+            requested_at=requested_at,
+            start_time=start_time,
+            end_time=end_time,
+            status=status,
+        )
+
+        rating = None
+        score = row.get('score')
+        if score not in (None, ''):
+            try:
+                score = int(score)
+            except (TypeError, ValueError):
+                raise RowError(f'score inválido: {score}')
+            if not 1 <= score <= 5:
+                raise RowError(f'score fuera de rango: {score}')
+            rating = Rating(
+                score=score,
+                comment=str(row.get('comment') or ''),
+                created_at=end_time or requested_at,
+            )
+        return trip, rating
+
+    def _user_id(self, row, field, required):
+        email = str(row.get(field) or '').strip().lower()
+        if not email:
+            if required:
+                raise RowError(f'falta {field}')
+            return None
+        if email not in self.users:
+            raise RowError(f'{field} desconocido: {email}')
+        if self.users[email] is None:
+            raise RowError(f'{field} ambiguo: {email}')
+        return self.users[email]
+
+    def _datetime(self, row, field, required=False):
+        value = row.get(field)
+        if value in (None, ''):
+            if required:
+                raise RowError(f'falta {field}')
+            return None
+        try:
+            parsed = parse_datetime(value) if isinstance(value, str) else None
+        except ValueError:
+            parsed = None
+        if not isinstance(parsed, datetime):
+            raise RowError(f'{field} inválido: {value}')
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed, self.default_tz)
+        return parsed
+
+    def _reject(self, line, error, row):
+        return (json.dumps(
+            {'line': line, 'error': error, 'row': row},
+            ensure_ascii=False, default=str,
+        ) + '\n').encode('utf-8')
+
+    def _flush(self, checkpoint, batch, rejected, position, rejects):
+        # Los rechazos se escriben antes del commit y el checkpoint guarda
+        # hasta dónde son válidos; al reanudar se trunca el archivo ahí, así
+        # que un corte entre ambos pasos no los duplica.
+        rejects.write(b''.join(rejected))
+        rejects.flush()
+
+        with transaction.atomic():
+            for trip, _ in batch:
+                trip.imported_from = checkpoint
+            trips = Trip.objects.bulk_create(trip for trip, _ in batch)
+            ratings = []
+            for trip, (_, rating) in zip(trips, batch):
+                if rating is not None:
+                    rating.trip = trip
+                    ratings.append(rating)
+            Rating.objects.bulk_create(ratings)
+
+            checkpoint.offset, checkpoint.line = position
+            checkpoint.rejects_offset = rejects.tell()
+            checkpoint.imported += len(batch)
+            checkpoint.rejected += len(rejected)
+            checkpoint.save()
+
+        if self.verbosity > 1:
+            self.stdout.write(
+                f'línea {checkpoint.line}: {checkpoint.imported} importados, '
+                f'{checkpoint.rejected} rechazados'
+            )
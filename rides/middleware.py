@@ -0,0 +1,24 @@
+from rest_framework.permissions import SAFE_METHODS
+
+from .routers import end_request, start_request
+
+
+class ReplicaPinningMiddleware:
+    """
+    Delimita el fijado al primario a cada request.
+
+    Los métodos no seguros se fijan al primario desde el inicio; en los
+    seguros, la primera escritura fija el resto del request. Al terminar se
+    cierra el alcance, así que el fijado no pasa al siguiente request atendido
+    por el mismo hilo.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = start_request(request.method not in SAFE_METHODS)
+        try:
+            return self.get_response(request)
+        finally:
+            end_request(token)
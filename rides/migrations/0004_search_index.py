@@ -0,0 +1,92 @@
+from django.db import migrations
+
+# Índices de texto completo para /api/search/ (ver rides/search.py).
+#
+# SQLite: una tabla FTS5 de contenido externo por modelo, con rowid = id del
+# registro y triggers que la mantienen sincronizada.
+# PostgreSQL: índices GIN sobre la expresión tsvector; al ser índices de
+# expresión, la base de datos los mantiene al día sin triggers.
+
+SEARCH_INDEXES = [
+    ('rides_rating', ['comment']),
+    ('rides_customuser', ['username', 'first_name', 'last_name', 'email']),
+    ('rides_vehicle', ['license_plate']),
+]
+
+FTS5_OPTIONS = "tokenize='unicode61 remove_diacritics 2', prefix='2 3'"
+
+
+def sqlite_forward(table, columns):
+    fts = f'{table}_fts'
+    cols = ', '.join(columns)
+    new_values = ', '.join(f'new.{c}' for c in columns)
+    old_values = ', '.join(f'old.{c}' for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}', "
+        f"content_rowid='id', {FTS5_OPTIONS})",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+    ]
+
+
+def sqlite_backward(table, columns):
+    fts = f'{table}_fts'
+    return [
+        f'DROP TRIGGER IF EXISTS {fts}_ai',
+        f'DROP TRIGGER IF EXISTS {fts}_ad',
+        f'DROP TRIGGER IF EXISTS {fts}_au',
+        f'DROP TABLE IF EXISTS {fts}',
+    ]
+
+
+def postgresql_document(columns):
+    # Debe coincidir con rides.search.postgresql_document().
+    parts = " || ' ' || ".join(f"coalesce({c}, '')" for c in columns)
+    return f"to_tsvector('simple', {parts})"
+
+
+def postgresql_forward(table, columns):
+    return [
+        f'CREATE INDEX {table}_search_idx ON {table} '
+        f'USING GIN ({postgresql_document(columns)})',
+    ]
+
+
+def postgresql_backward(table, columns):
+    return [f'DROP INDEX IF EXISTS {table}_search_idx']
+
+
+STATEMENTS = {
+    'sqlite': (sqlite_forward, sqlite_backward),
+    'postgresql': (postgresql_forward, postgresql_backward),
+}
+
+
+def run(direction):
+    def operation(apps, schema_editor):
+        builders = STATEMENTS.get(schema_editor.connection.vendor)
+        if builders is None:
+            # Otros motores usan el respaldo con icontains de rides.search.
+            return
+        build = builders[direction]
+        for table, columns in SEARCH_INDEXES:
+            for sql in build(table, columns):
+                schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rides', '0003_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(0), run(1)),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-19 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rides', '0004_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=500, unique=True)),
+                ('offset', models.PositiveBigIntegerField(default=0)),
+                ('line', models.PositiveBigIntegerField(default=0)),
+                ('rejects_offset', models.PositiveBigIntegerField(default=0)),
+                ('imported', models.PositiveBigIntegerField(default=0)),
+                ('rejected', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Checkpoint de importación',
+                'verbose_name_plural': 'Checkpoints de importación',
+            },
+        ),
+    ]
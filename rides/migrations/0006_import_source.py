@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-19 15:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rides', '0005_import_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importcheckpoint',
+            name='fingerprint',
+            field=models.CharField(blank=True, help_text='SHA-256 del primer bloque del archivo importado.', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='trip',
+            name='imported_from',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Importación que creó el viaje (manage.py import_trips).', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trips', to='rides.importcheckpoint'),
+        ),
+    ]
@@ -4,7 +4,20 @@ from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
-class CustomUser(AbstractUser):
+class VersionedModelMixin:
+    """
+    `updated_at` es la versión del registro (ver
+    serializers.VersionedFragmentMixin): se agrega a save(update_fields=...)
+    para que también se escriba en guardados parciales.
+    """
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields:
+            update_fields = {*update_fields, 'updated_at'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class CustomUser(VersionedModelMixin, AbstractUser):
     """
     Extiende el modelo de usuario para distinguir roles en la app de ride-sharing.
     """
@@ -20,6 +33,10 @@ class CustomUser(AbstractUser):
         default=True,
         help_text="¿Está disponible para recibir solicitudes de viaje?"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Versión del registro: cambia en cada save()."
+    )
 
     def __str__(self):
         return self.get_full_name() or self.username
@@ -30,7 +47,7 @@ class CustomUser(AbstractUser):
         ordering = ['username']
 
 
-class Vehicle(models.Model):
+class Vehicle(VersionedModelMixin, models.Model):
     """
     Vehículo asociado a un conductor (User con is_driver=True).
     """
@@ -42,6 +59,7 @@ class Vehicle(models.Model):
     license_plate = models.CharField(max_length=20, unique=True)
     model = models.CharField(max_length=100)
     capacity = models.PositiveIntegerField(default=4)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f'{self.model} ({self.license_plate})'
@@ -52,7 +70,7 @@ class Vehicle(models.Model):
         ordering = ['license_plate']
 
 
-class Trip(models.Model):
+class Trip(VersionedModelMixin, models.Model):
     """
     Viaje solicitado por un pasajero y asignado a un conductor.
     Estado: PENDING, ONGOING, COMPLETED, CANCELLED.
@@ -89,6 +107,16 @@ class Trip(models.Model):
         choices=STATUS_CHOICES,
         default=STATUS_PENDING
     )
+    updated_at   = models.DateTimeField(auto_now=True)
+    imported_from = models.ForeignKey(
+        'ImportCheckpoint',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='trips',
+        help_text="Importación que creó el viaje (manage.py import_trips)."
+    )
 
     def __str__(self):
         driver_name = self.driver.get_full_name() if self.driver else "unassigned"
@@ -101,7 +129,7 @@ class Trip(models.Model):
         ordering = ['-requested_at']
 
 
-class Rating(models.Model):
+class Rating(VersionedModelMixin, models.Model):
     """
     Valoración de un viaje: relación uno a uno con Trip.
     Score de 1 a 5.
@@ -116,6 +144,7 @@ class Rating(models.Model):
     )
     comment    = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f'Rating {self.score} for Trip {self.trip.id}'
@@ -124,3 +153,29 @@ class Rating(models.Model):
         verbose_name = "Valoración"
         verbose_name_plural = "Valoraciones"
         ordering = ['-created_at']
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Progreso de `manage.py import_trips` para un archivo de origen.
+    Se actualiza en la misma transacción que cada lote importado.
+    """
+    source         = models.CharField(max_length=500, unique=True)
+    fingerprint    = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="SHA-256 del primer bloque del archivo importado."
+    )
+    offset         = models.PositiveBigIntegerField(default=0)
+    line           = models.PositiveBigIntegerField(default=0)
+    rejects_offset = models.PositiveBigIntegerField(default=0)
+    imported       = models.PositiveBigIntegerField(default=0)
+    rejected       = models.PositiveBigIntegerField(default=0)
+    updated_at     = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.source} (línea {self.line})'
+
+    class Meta:
+        verbose_name = "Checkpoint de importación"
+        verbose_name_plural = "Checkpoints de importación"
@@ -0,0 +1,84 @@
+import itertools
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Modelos cuyas lecturas pueden servirse desde una réplica.
+REPLICATED_MODELS = {
+    'rides.customuser',
+    'rides.vehicle',
+    'rides.trip',
+    'rides.rating',
+}
+
+# Fijado al primario del request en curso: None fuera de un request, y
+# False/True dentro (lo inicializa ReplicaPinningMiddleware).
+_pinned_to_primary = ContextVar('pinned_to_primary', default=None)
+
+
+def start_request(pinned):
+    """
+    Abre el alcance de fijado de un request. Devuelve un token para
+    `end_request`.
+    """
+    return _pinned_to_primary.set(pinned)
+
+
+def end_request(token):
+    _pinned_to_primary.reset(token)
+
+
+def pin_to_primary():
+    """
+    Envía al primario las lecturas siguientes del request en curso. Fuera de
+    un request no tiene efecto.
+    """
+    if _pinned_to_primary.get() is not None:
+        _pinned_to_primary.set(True)
+
+
+def is_pinned():
+    return bool(_pinned_to_primary.get())
+
+
+class PrimaryReplicaRouter:
+    """
+    Router primario/réplica para los modelos de `rides`.
+
+    - Las escrituras siempre van a `default` y fijan el request en curso al
+      primario, de modo que sus lecturas posteriores ven lo escrito.
+    - Las lecturas de modelos replicados se reparten en round-robin entre
+      `settings.DATABASE_REPLICAS` mientras el request no esté fijado.
+
+    Fuera de un request (comandos, shell, migraciones) no hay fijado: para
+    leer lo recién escrito hay que usar `.using('default')`.
+    """
+
+    def __init__(self):
+        self.replicas = list(getattr(settings, 'DATABASE_REPLICAS', []))
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+
+    def db_for_read(self, model, **hints):
+        if model._meta.label_lower not in REPLICATED_MODELS:
+            return None
+        if self._cycle is None or is_pinned():
+            return DEFAULT_DB_ALIAS
+        return next(self._cycle)
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primario y réplicas contienen los mismos datos.
+        databases = {DEFAULT_DB_ALIAS, *self.replicas}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las réplicas reciben el esquema por replicación, no por migrate.
+        if db in self.replicas:
+            return False
+        return None
@@ -0,0 +1,103 @@
+import re
+from functools import reduce
+from operator import or_
+
+from django.contrib.auth import get_user_model
+from django.db import connections, router
+from django.db.models import Q
+
+from .models import Rating, Vehicle
+
+User = get_user_model()
+
+# Campos indexados por modelo; deben coincidir con la migración 0004.
+SEARCH_FIELDS = {
+    Rating: ['comment'],
+    User: ['username', 'first_name', 'last_name', 'email'],
+    Vehicle: ['license_plate'],
+}
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def fts5_query(tokens):
+    # Cada término entre comillas (sin sintaxis FTS5 del usuario) y con
+    # prefijo: "jua"* "ro"* encuentra "Juan Rodriguez".
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def tsquery(tokens):
+    return ' & '.join(f'{token}:*' for token in tokens)
+
+
+def postgresql_document(columns):
+    parts = " || ' ' || ".join(f"coalesce({c}, '')" for c in columns)
+    return f"to_tsvector('simple', {parts})"
+
+
+def search_ids(model, text, limit=20, using=None):
+    """
+    Devuelve los ids de `model` que coinciden con `text`, del más al menos
+    relevante. Todos los términos deben aparecer, como prefijo de una palabra,
+    en alguno de los campos de SEARCH_FIELDS. Sin `using`, la base de datos
+    la elige el router.
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return []
+
+    alias = using or router.db_for_read(model)
+    connection = connections[alias]
+    table = model._meta.db_table
+    columns = SEARCH_FIELDS[model]
+
+    if connection.vendor == 'sqlite':
+        fts = f'{table}_fts'
+        sql = (
+            f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s '
+            f'ORDER BY rank LIMIT %s'
+        )
+        params = [fts5_query(tokens), limit]
+    elif connection.vendor == 'postgresql':
+        document = postgresql_document(columns)
+        sql = (
+            f"SELECT id FROM {table} "
+            f"WHERE {document} @@ to_tsquery('simple', %s) "
+            f"ORDER BY ts_rank({document}, to_tsquery('simple', %s)) DESC, id "
+            f"LIMIT %s"
+        )
+        query = tsquery(tokens)
+        params = [query, query, limit]
+    else:
+        return icontains_ids(model, tokens, limit, using=alias)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def icontains_ids(model, tokens, limit, using=None):
+    """
+    Respaldo sin índice (recorre la tabla completa) para motores sin FTS.
+    """
+    queryset = model.objects.using(using)
+    for token in tokens:
+        queryset = queryset.filter(reduce(or_, (
+            Q(**{f'{field}__icontains': token}) for field in SEARCH_FIELDS[model]
+        )))
+    return list(queryset.values_list('pk', flat=True)[:limit])
+
+
+def search(model, text, limit=20, queryset=None):
+    """
+    Como `search_ids`, pero devuelve los objetos en orden de relevancia.
+    """
+    ids = search_ids(model, text, limit)
+    if queryset is None:
+        queryset = model.objects.all()
+    objects = queryset.in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
@@ -1,11 +1,46 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from .cache import fragment_cache
 from .models import Vehicle, Trip, Rating
 
 User = get_user_model()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class VersionedFragmentMixin:
+    """
+    Cachea la representación de cada objeto en `fragment_cache`.
+
+    La clave incluye el `updated_at` del objeto y el de los relacionados que
+    anida (`fragment_related`), así que cualquier save() de ellos produce una
+    clave nueva y la entrada vieja termina desalojada por LRU. Los
+    save(update_fields=...) incluyen `updated_at` (ver
+    models.VersionedModelMixin); las escrituras con `QuerySet.update()` no lo
+    tocan y deben actualizarlo a mano.
+    """
+    fragment_related = ()
+
+    def to_representation(self, instance):
+        key = self.fragment_key(instance)
+        data = fragment_cache.get(key)
+        if data is None:
+            data = super().to_representation(instance)
+            fragment_cache.set(key, data)
+        return data
+
+    def fragment_key(self, instance):
+        key = [type(self).__qualname__, instance.pk, instance.updated_at]
+        for name in self.fragment_related:
+            # Los accesores uno-a-uno inversos lanzan una subclase de
+            # AttributeError cuando no hay objeto relacionado.
+            related = getattr(instance, name, None)
+            if related is None:
+                key.append(None)
+            else:
+                key.extend((related.pk, related.updated_at))
+        return tuple(key)
+
+
+class UserSerializer(VersionedFragmentMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = [
@@ -20,8 +55,9 @@ class UserSerializer(serializers.ModelSerializer):
         ]
 
 
-class VehicleSerializer(serializers.ModelSerializer):
+class VehicleSerializer(VersionedFragmentMixin, serializers.ModelSerializer):
     driver = UserSerializer(read_only=True)
+    fragment_related = ('driver',)
 
     class Meta:
         model = Vehicle
@@ -34,7 +70,7 @@ class VehicleSerializer(serializers.ModelSerializer):
         ]
 
 
-class RatingSerializer(serializers.ModelSerializer):
+class RatingSerializer(VersionedFragmentMixin, serializers.ModelSerializer):
     class Meta:
         model = Rating
         fields = [
@@ -46,10 +82,11 @@ class RatingSerializer(serializers.ModelSerializer):
         ]
 
 
-class TripSerializer(serializers.ModelSerializer):
+class TripSerializer(VersionedFragmentMixin, serializers.ModelSerializer):
     passenger = UserSerializer(read_only=True)
     driver = UserSerializer(read_only=True)
     rating = RatingSerializer(read_only=True)
+    fragment_related = ('passenger', 'driver', 'rating')
 
     class Meta:
         model = Trip
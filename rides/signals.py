@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import list_coalescer
+from .models import Rating, Trip, Vehicle
+from .serializers import (
+    RatingSerializer,
+    TripSerializer,
+    UserSerializer,
+    VehicleSerializer,
+)
+
+User = get_user_model()
+
+# Campos que aparecen en los listados de cada modelo.
+LISTED_FIELDS = {
+    User: set(UserSerializer.Meta.fields),
+    Vehicle: set(VehicleSerializer.Meta.fields),
+    Trip: set(TripSerializer.Meta.fields),
+    Rating: set(RatingSerializer.Meta.fields),
+}
+
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=Vehicle)
+@receiver([post_save, post_delete], sender=Trip)
+@receiver([post_save, post_delete], sender=Rating)
+def invalidate_coalesced_lists(sender, update_fields=None, **kwargs):
+    """
+    Una escritura deja obsoletos los listados compartidos por
+    CoalescedListMixin. Se ignoran los save(update_fields=...) que no tocan
+    campos listados, como el de `last_login` en cada inicio de sesión. Las
+    escrituras sin señales (bulk_create, update) se reflejan al vencer
+    RIDES_COALESCE_TTL.
+    """
+    if update_fields is not None and not LISTED_FIELDS[sender] & set(update_fields):
+        return
+    list_coalescer.invalidate()
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class PrimaryOnlyTestRunner(DiscoverRunner):
+    """
+    Runner de pruebas que envía todas las consultas a 'default' y desactiva
+    la coalescencia de listados.
+
+    Las réplicas son archivos aparte que sólo ven lo que se copia en ellos,
+    así que un TestCase normal no vería sus propios datos. Las pruebas del
+    enrutamiento activan las réplicas explícitamente
+    (ver rides.tests.test_routers.ReplicaTransactionTestCase). Del mismo
+    modo, `list_coalescer` es global y las pruebas revierten sus datos sin
+    emitir señales: sólo las pruebas de coalescencia la activan.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._test_settings = override_settings(
+            DATABASE_REPLICAS=[],
+            # Reconstruye los routers con la nueva lista de réplicas.
+            DATABASE_ROUTERS=settings.DATABASE_ROUTERS,
+            RIDES_COALESCE_LISTS=False,
+        )
+        self._test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._test_settings.disable()
+        super().teardown_test_environment(**kwargs)
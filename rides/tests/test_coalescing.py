@@ -0,0 +1,223 @@
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth.models import update_last_login
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from rides.cache import SingleFlight, list_coalescer
+from rides.models import CustomUser, Trip
+from rides.views import DriverViewSet, TripViewSet
+
+
+class SingleFlightTests(SimpleTestCase):
+
+    def run_concurrently(self, flight, func, callers):
+        """
+        Lanza `callers` llamadas a flight.do('k', func) mientras la primera
+        sigue en curso y devuelve lo que recibió cada una (resultado o error).
+        """
+        started, release = threading.Event(), threading.Event()
+        outcomes = []
+
+        def leader_func():
+            started.set()
+            release.wait(5)
+            return func()
+
+        def call(target):
+            try:
+                outcomes.append(flight.do('k', target))
+            except Exception as exc:
+                outcomes.append(exc)
+
+        threads = [threading.Thread(target=call, args=(leader_func,))]
+        threads[0].start()
+        started.wait(5)
+        threads += [
+            threading.Thread(target=call, args=(func,)) for _ in range(callers - 1)
+        ]
+        for thread in threads[1:]:
+            thread.start()
+        while flight.stats()['shared'] < callers - 1:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        return outcomes
+
+    def test_concurrent_calls_run_once(self):
+        calls = []
+        flight = SingleFlight(ttl=0)
+        outcomes = self.run_concurrently(flight, lambda: calls.append(1) or 'ok', 20)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(outcomes, ['ok'] * 20)
+        self.assertEqual(flight.stats()['leaders'], 1)
+
+    def test_errors_reach_waiters_and_are_not_cached(self):
+        calls = []
+
+        def fail():
+            calls.append(1)
+            raise ValueError('falló')
+
+        flight = SingleFlight(ttl=60)
+        outcomes = self.run_concurrently(flight, fail, 5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(outcomes), 5)
+        self.assertTrue(all(isinstance(o, ValueError) for o in outcomes))
+        self.assertEqual(flight.stats()['results'], 0)
+        self.assertEqual(flight.do('k', lambda: 'ok'), 'ok')
+
+    def test_results_expire_after_ttl(self):
+        clock = [100.0]
+        flight = SingleFlight(ttl=0.5)
+        with mock.patch('rides.cache.time.monotonic', lambda: clock[0]):
+            self.assertEqual(flight.do('k', lambda: 1), 1)
+            clock[0] += 0.4
+            self.assertEqual(flight.do('k', lambda: 2), 1)
+            clock[0] += 0.2
+            self.assertEqual(flight.do('otra', lambda: 3), 3)
+            # La entrada vencida se descarta en cualquier llamada.
+            self.assertEqual(flight.stats()['results'], 1)
+            self.assertEqual(flight.do('k', lambda: 4), 4)
+
+    def test_results_are_bounded(self):
+        flight = SingleFlight(ttl=60, max_entries=2)
+        for key in ('a', 'b', 'c'):
+            flight.do(key, lambda: key)
+
+        self.assertEqual(flight.stats()['results'], 2)
+        self.assertEqual(flight.do('a', lambda: 'nuevo'), 'nuevo')
+
+    def test_invalidate_discards_results(self):
+        flight = SingleFlight(ttl=60)
+        flight.do('k', lambda: 1)
+        flight.invalidate()
+        self.assertEqual(flight.do('k', lambda: 2), 2)
+
+    def test_waiters_give_up_after_timeout(self):
+        flight = SingleFlight(ttl=0, wait_timeout=0.01)
+        release = threading.Event()
+        leader = threading.Thread(target=flight.do, args=('k', lambda: release.wait(5)))
+        leader.start()
+        while flight.stats()['in_flight'] == 0:
+            time.sleep(0.001)
+
+        self.assertEqual(flight.do('k', lambda: 'propio'), 'propio')
+        self.assertEqual(flight.stats()['timeouts'], 1)
+        release.set()
+        leader.join(5)
+
+
+@override_settings(RIDES_COALESCE_LISTS=True)
+class CoalescedListViewTests(TestCase):
+
+    def setUp(self):
+        list_coalescer.clear()
+        self.addCleanup(list_coalescer.clear)
+        self.user = CustomUser.objects.create(username='usuario', is_driver=True)
+        self.staff = CustomUser.objects.create(username='staff', is_staff=True)
+        self.factory = APIRequestFactory()
+
+    def get(self, viewset, url, user=None):
+        request = self.factory.get(url)
+        force_authenticate(request, user=user or self.user)
+        response = viewset.as_view({'get': 'list'})(request)
+        response.render()
+        return response
+
+    def queries_for(self, viewset, url, user=None):
+        with CaptureQueriesContext(connection) as queries:
+            self.get(viewset, url, user)
+        return len(queries)
+
+    def test_identical_requests_share_result(self):
+        self.assertGreater(self.queries_for(TripViewSet, '/api/trips/'), 0)
+        self.assertEqual(self.queries_for(TripViewSet, '/api/trips/'), 0)
+
+    def test_key_ignores_unused_params_only(self):
+        self.queries_for(TripViewSet, '/api/trips/?driver=1&x=1')
+        self.assertEqual(self.queries_for(TripViewSet, '/api/trips/?x=2&driver=1'), 0)
+        self.assertGreater(self.queries_for(TripViewSet, '/api/trips/?driver=2'), 0)
+
+    def test_different_scopes_do_not_share(self):
+        self.queries_for(DriverViewSet, '/api/drivers/', self.user)
+        self.assertGreater(self.queries_for(DriverViewSet, '/api/drivers/', self.staff), 0)
+
+    def test_login_does_not_invalidate_lists(self):
+        self.queries_for(DriverViewSet, '/api/drivers/')
+        # login() guarda last_login con save(update_fields=['last_login']).
+        with mock.patch.object(list_coalescer, 'invalidate') as invalidate:
+            self.client.force_login(self.user)
+        invalidate.assert_not_called()
+        self.client.force_login(self.staff)
+        self.assertEqual(self.queries_for(DriverViewSet, '/api/drivers/'), 0)
+
+    def test_saving_listed_fields_invalidates_lists(self):
+        with mock.patch.object(list_coalescer, 'invalidate') as invalidate:
+            self.user.first_name = 'Ana'
+            self.user.save(update_fields=['first_name'])
+        invalidate.assert_called_once_with()
+
+    def test_writes_invalidate_lists(self):
+        before = len(self.get(TripViewSet, '/api/trips/').data)
+        Trip.objects.create(passenger=self.user)
+        self.assertEqual(len(self.get(TripViewSet, '/api/trips/').data), before + 1)
+
+
+@override_settings(RIDES_COALESCE_LISTS=True)
+class ConcurrentListRequestsTests(TransactionTestCase):
+
+    def setUp(self):
+        list_coalescer.clear()
+        self.addCleanup(list_coalescer.clear)
+        self.user = CustomUser.objects.create(username='usuario', is_driver=True)
+
+    def burst(self, clients, login=False):
+        """
+        Lanza `clients` requests idénticos a la vez y devuelve el total de
+        consultas ejecutadas por los listados. Con `login`, cada cliente
+        inicia sesión justo antes de su request.
+        """
+        factory = APIRequestFactory()
+        view = TripViewSet.as_view({'get': 'list'})
+        barrier = threading.Barrier(clients)
+        counts = []
+
+        def client():
+            request = factory.get(f'/api/trips/?driver={self.user.pk}')
+            force_authenticate(request, user=self.user)
+            try:
+                barrier.wait(5)
+                if login:
+                    update_last_login(None, CustomUser.objects.get(pk=self.user.pk))
+                with CaptureQueriesContext(connections['default']) as queries:
+                    view(request).render()
+                counts.append(len(queries))
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=client) for _ in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        return sum(counts)
+
+    def test_concurrent_identical_requests_run_one_query(self):
+        with override_settings(RIDES_COALESCE_LISTS=False):
+            single = self.burst(1)
+        list_coalescer.clear()
+        self.assertEqual(self.burst(20), single)
+
+    def test_logins_during_burst_keep_sharing(self):
+        with override_settings(RIDES_COALESCE_LISTS=False):
+            single = self.burst(1)
+        list_coalescer.clear()
+        self.assertEqual(self.burst(20, login=True), single)
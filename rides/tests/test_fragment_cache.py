@@ -0,0 +1,98 @@
+from django.test import SimpleTestCase, TestCase
+
+from rides.cache import LRUCache, fragment_cache
+from rides.models import CustomUser, Rating, Trip
+from rides.serializers import TripSerializer
+
+
+class LRUCacheTests(SimpleTestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(len(cache), 2)
+
+    def test_stats(self):
+        cache = LRUCache(max_entries=1)
+        cache.set('a', 1)
+        cache.get('a')
+        cache.set('b', 2)
+        cache.get('a')
+
+        stats = cache.stats()
+        self.assertEqual(stats['entries'], 1)
+        self.assertEqual(stats['max_entries'], 1)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+
+class TripFragmentCacheTests(TestCase):
+
+    def setUp(self):
+        fragment_cache.clear()
+        self.addCleanup(fragment_cache.clear)
+        self.passenger = CustomUser.objects.create(username='pasajero')
+        self.driver = CustomUser.objects.create(
+            username='conductor', first_name='Ana', is_driver=True
+        )
+        self.trip = Trip.objects.create(
+            passenger=self.passenger,
+            driver=self.driver,
+            status=Trip.STATUS_COMPLETED,
+        )
+
+    def serialize(self):
+        trip = Trip.objects.select_related('passenger', 'driver', 'rating').get(pk=self.trip.pk)
+        return TripSerializer(trip).data
+
+    def test_unchanged_trip_is_served_from_cache(self):
+        self.serialize()
+        hits = fragment_cache.stats()['hits']
+        self.serialize()
+        # Un solo acierto: el fragmento del viaje ya incluye a los anidados.
+        self.assertEqual(fragment_cache.stats()['hits'], hits + 1)
+
+    def test_adding_rating_changes_trip(self):
+        self.assertIsNone(self.serialize()['rating'])
+        Rating.objects.create(trip=self.trip, score=4, comment='bien')
+        self.assertEqual(self.serialize()['rating']['comment'], 'bien')
+
+    def test_saving_rating_changes_trip(self):
+        rating = Rating.objects.create(trip=self.trip, score=4, comment='bien')
+        self.serialize()
+        rating.comment = 'muy bien'
+        rating.save()
+        self.assertEqual(self.serialize()['rating']['comment'], 'muy bien')
+
+    def test_saving_user_changes_trip(self):
+        self.serialize()
+        self.driver.first_name = 'Beatriz'
+        self.driver.save()
+        self.assertEqual(self.serialize()['driver']['first_name'], 'Beatriz')
+
+    def test_partial_save_of_user_changes_trip(self):
+        self.serialize()
+        self.driver.first_name = 'Beatriz'
+        self.driver.save(update_fields=['first_name'])
+        self.assertEqual(self.serialize()['driver']['first_name'], 'Beatriz')
+
+    def test_empty_update_fields_still_skips_save(self):
+        before = CustomUser.objects.get(pk=self.driver.pk).updated_at
+        self.driver.save(update_fields=[])
+        self.assertEqual(CustomUser.objects.get(pk=self.driver.pk).updated_at, before)
+
+    def test_deleted_driver_is_removed_from_trip(self):
+        # SET_NULL actualiza el viaje con QuerySet.update(), sin tocar su
+        # updated_at: la clave cambia porque ya no hay conductor relacionado.
+        self.serialize()
+        self.driver.delete()
+        self.assertIsNone(self.serialize()['driver'])
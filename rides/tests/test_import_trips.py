@@ -0,0 +1,210 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from rides.management.commands.import_trips import Command
+from rides.models import CustomUser, ImportCheckpoint, Rating, Trip
+
+
+class Killed(Exception):
+    """Simula que el proceso muere a mitad de la importación."""
+
+
+def ndjson(*rows):
+    return b''.join(
+        row if isinstance(row, bytes) else json.dumps(row).encode() + b'\n'
+        for row in rows
+    )
+
+
+def trip_row(n, **extra):
+    return {
+        'passenger_email': 'pasajero@example.com',
+        'driver_email': 'conductor@example.com',
+        'requested_at': f'2020-01-{n:02d}T08:00:00',
+        'status': 'COMPLETED',
+        **extra,
+    }
+
+
+class ImportTripsTests(TestCase):
+
+    def setUp(self):
+        self.passenger = CustomUser.objects.create(
+            username='pasajero', email='pasajero@example.com'
+        )
+        self.driver = CustomUser.objects.create(
+            username='conductor', email='Conductor@example.com', is_driver=True
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = directory.name
+
+    def write(self, name, content):
+        path = os.path.join(self.dir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def run_import(self, path, **options):
+        call_command('import_trips', path, stdout=StringIO(), **options)
+
+    def imported(self):
+        return Trip.objects.filter(passenger=self.passenger)
+
+    def rejects(self, path):
+        with open(f'{path}.rejects', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_ndjson(self):
+        path = self.write('viajes.ndjson', ndjson(
+            trip_row(1, score=5, comment='excelente'),
+            trip_row(2),
+            trip_row(3, status='PERDIDO'),
+            b'{no es json\n',
+            b'\n',
+            json.dumps(trip_row(4)).encode('utf-8')[:-1] + b', "comment": "\xff"}\n',
+            trip_row(5, passenger_email='nadie@example.com'),
+        ))
+
+        self.run_import(path, batch_size=2)
+
+        trips = self.imported().order_by('requested_at')
+        self.assertEqual(trips.count(), 2)
+        self.assertEqual(trips[0].requested_at.day, 1)
+        self.assertEqual(trips[0].driver, self.driver)
+        self.assertEqual(trips[0].rating.comment, 'excelente')
+        self.assertFalse(Rating.objects.filter(trip=trips[1]).exists())
+
+        rejects = self.rejects(path)
+        self.assertEqual([r['line'] for r in rejects], [3, 4, 6, 7])
+        self.assertIn('status', rejects[0]['error'])
+        self.assertIn('JSON', rejects[1]['error'])
+        self.assertIn('UTF-8', rejects[2]['error'])
+        self.assertIn('desconocido', rejects[3]['error'])
+
+        checkpoint = ImportCheckpoint.objects.get(source=os.path.abspath(path))
+        self.assertEqual((checkpoint.imported, checkpoint.rejected), (2, 4))
+
+    def test_csv(self):
+        old_limit = csv.field_size_limit(200)
+        self.addCleanup(csv.field_size_limit, old_limit)
+        content = (
+            'passenger_email,driver_email,requested_at,status,score,comment\n'
+            'pasajero@example.com,,2020-01-01T08:00:00,COMPLETED,4,"muy\n'
+            'bien, gracias"\n'
+            'pasajero@example.com,,2020-01-02T08:00:00,CANCELLED,,\n'
+            f'pasajero@example.com,,2020-01-03T08:00:00,COMPLETED,1,"{"x" * 300}"\n'
+            'pasajero@example.com,,2020-01-04T08:00:00,COMPLETED,2,mal\n'
+        ).encode('utf-8') + (
+            b'pasajero@example.com,,2020-01-05T08:00:00,COMPLETED,3,\xe9\n'
+            b'pasajero@example.com,,2020-01-06T08:00:00,COMPLETED,9,\n'
+        )
+        path = self.write('viajes.csv', content)
+
+        self.run_import(path, batch_size=2)
+
+        trips = self.imported().order_by('requested_at')
+        self.assertEqual([t.requested_at.day for t in trips], [1, 2, 4])
+        self.assertEqual(trips[0].rating.comment, 'muy\nbien, gracias')
+        self.assertIsNone(trips[0].driver)
+
+        rejects = self.rejects(path)
+        self.assertEqual([r['line'] for r in rejects], [5, 7, 8])
+        self.assertIn('CSV', rejects[0]['error'])
+        self.assertIn('UTF-8', rejects[1]['error'])
+        self.assertIn('score', rejects[2]['error'])
+
+    def test_resume_after_kill_between_batches(self):
+        path = self.write('viajes.ndjson', ndjson(
+            trip_row(1), trip_row(2, status='X'), trip_row(3), trip_row(4), trip_row(5),
+        ))
+        flush = Command._flush
+
+        def flush_then_die(command, *args):
+            flush(command, *args)
+            raise Killed
+
+        with mock.patch.object(Command, '_flush', flush_then_die):
+            with self.assertRaises(Killed):
+                self.run_import(path, batch_size=2)
+        self.assertEqual(self.imported().count(), 1)
+
+        self.run_import(path, batch_size=2)
+
+        self.assertEqual(self.imported().count(), 4)
+        self.assertEqual(len(self.rejects(path)), 1)
+
+    def test_resume_after_kill_before_checkpoint_commit(self):
+        path = self.write('viajes.ndjson', ndjson(
+            trip_row(1), trip_row(2, status='X'), trip_row(3), trip_row(4),
+        ))
+        save = ImportCheckpoint.save
+        calls = []
+
+        def save_or_die(checkpoint, *args, **kwargs):
+            calls.append(checkpoint)
+            # La primera llamada crea el checkpoint; la segunda es el primer lote.
+            if len(calls) == 2:
+                raise Killed
+            return save(checkpoint, *args, **kwargs)
+
+        with mock.patch.object(ImportCheckpoint, 'save', save_or_die):
+            with self.assertRaises(Killed):
+                self.run_import(path, batch_size=2)
+        # El lote se revierte junto con su checkpoint.
+        self.assertEqual(self.imported().count(), 0)
+
+        self.run_import(path, batch_size=2)
+
+        self.assertEqual(self.imported().count(), 3)
+        self.assertEqual([r['line'] for r in self.rejects(path)], [2])
+
+    def test_driver_must_be_another_driver(self):
+        path = self.write('viajes.ndjson', ndjson(
+            trip_row(1, driver_email='pasajero@example.com'),
+            trip_row(2, passenger_email='conductor@example.com'),
+            trip_row(3),
+        ))
+        self.run_import(path)
+
+        self.assertEqual(self.imported().count(), 1)
+        self.assertEqual(
+            [r['error'] for r in self.rejects(path)],
+            ['driver_email no es conductor', 'el conductor no puede ser el pasajero'],
+        )
+
+    def test_restart_replaces_previous_import(self):
+        other = Trip.objects.create(passenger=self.passenger)
+        path = self.write('viajes.ndjson', ndjson(
+            trip_row(1, score=4), trip_row(2, status='X'),
+        ))
+        self.run_import(path)
+        self.run_import(path, restart=True)
+
+        self.assertEqual(self.imported().exclude(pk=other.pk).count(), 1)
+        self.assertTrue(Trip.objects.filter(pk=other.pk).exists())
+        self.assertEqual(Rating.objects.filter(trip__passenger=self.passenger).count(), 1)
+        self.assertEqual(len(self.rejects(path)), 1)
+        checkpoint = ImportCheckpoint.objects.get(source=os.path.abspath(path))
+        self.assertEqual((checkpoint.imported, checkpoint.rejected), (1, 1))
+
+    def test_replaced_file_is_refused(self):
+        path = self.write('viajes.ndjson', ndjson(trip_row(1), trip_row(2)))
+        self.run_import(path)
+        self.write('viajes.ndjson', ndjson(trip_row(3), trip_row(4), trip_row(5)))
+
+        with self.assertRaisesMessage(CommandError, '--restart'):
+            self.run_import(path)
+        self.assertEqual(self.imported().count(), 2)
+
+        self.run_import(path, restart=True)
+        self.assertEqual(
+            sorted(t.requested_at.day for t in self.imported()), [3, 4, 5]
+        )
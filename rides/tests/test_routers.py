@@ -0,0 +1,127 @@
+from unittest import skipUnless
+
+from django.contrib.auth.models import Permission
+from django.contrib.sessions.models import Session
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase
+from django.test.utils import override_settings
+
+from rides.middleware import ReplicaPinningMiddleware
+from rides.models import CustomUser, Trip
+from rides.routers import PrimaryReplicaRouter, end_request, is_pinned, start_request
+
+REPLICAS = [alias for alias in connections if alias != DEFAULT_DB_ALIAS]
+
+
+@override_settings(DATABASE_REPLICAS=['replica_a', 'replica_b'])
+class PrimaryReplicaRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_round_robin_across_replicas(self):
+        self.assertEqual(
+            [self.router.db_for_read(Trip) for _ in range(5)],
+            ['replica_a', 'replica_b', 'replica_a', 'replica_b', 'replica_a'],
+        )
+
+    def test_write_pins_rest_of_request_to_primary(self):
+        token = start_request(False)
+        try:
+            self.assertEqual(self.router.db_for_read(Trip), 'replica_a')
+            self.assertEqual(self.router.db_for_write(Trip), DEFAULT_DB_ALIAS)
+            self.assertEqual(self.router.db_for_read(Trip), DEFAULT_DB_ALIAS)
+            self.assertEqual(self.router.db_for_read(CustomUser), DEFAULT_DB_ALIAS)
+        finally:
+            end_request(token)
+        self.assertEqual(self.router.db_for_read(Trip), 'replica_b')
+
+    def test_write_outside_request_does_not_pin(self):
+        self.router.db_for_write(Trip)
+        self.assertFalse(is_pinned())
+        self.assertEqual(self.router.db_for_read(Trip), 'replica_a')
+
+    def test_non_replicated_models_are_not_routed(self):
+        self.assertIsNone(self.router.db_for_read(Session))
+        self.assertIsNone(self.router.db_for_read(Permission))
+
+    def test_replicas_are_not_migrated(self):
+        self.assertIs(self.router.allow_migrate('replica_a', 'rides'), False)
+        self.assertIsNone(self.router.allow_migrate(DEFAULT_DB_ALIAS, 'rides'))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_reads_go_to_primary(self):
+        self.assertEqual(PrimaryReplicaRouter().db_for_read(Trip), DEFAULT_DB_ALIAS)
+
+
+class ReplicaPinningMiddlewareTests(SimpleTestCase):
+
+    def pinned_during(self, method):
+        seen = []
+        middleware = ReplicaPinningMiddleware(lambda request: seen.append(is_pinned()))
+        middleware(getattr(RequestFactory(), method)('/'))
+        return seen[0]
+
+    def test_unsafe_methods_are_pinned(self):
+        for method in ('post', 'put', 'patch', 'delete'):
+            with self.subTest(method=method):
+                self.assertTrue(self.pinned_during(method))
+
+    def test_safe_methods_are_not_pinned(self):
+        for method in ('get', 'head', 'options'):
+            with self.subTest(method=method):
+                self.assertFalse(self.pinned_during(method))
+
+    def test_pin_does_not_outlive_request(self):
+        self.pinned_during('post')
+        self.assertFalse(is_pinned())
+
+
+@skipUnless(REPLICAS, 'DJANGO_DB_REPLICAS=0')
+@override_settings(
+    DATABASE_REPLICAS=REPLICAS,
+    DATABASE_ROUTERS=['rides.routers.PrimaryReplicaRouter'],
+)
+class ReplicaTransactionTestCase(TransactionTestCase):
+    """
+    Pruebas con réplicas reales: cada réplica es otro archivo SQLite que sólo
+    ve los datos de 'default' tras `sync_replicas()`.
+    """
+    databases = {DEFAULT_DB_ALIAS, *REPLICAS}
+
+    def sync_replicas(self):
+        source = connections[DEFAULT_DB_ALIAS]
+        source.ensure_connection()
+        for alias in REPLICAS:
+            replica = connections[alias]
+            replica.ensure_connection()
+            source.connection.backup(replica.connection)
+
+    def test_reads_come_from_replica(self):
+        CustomUser.objects.create(username='nuevo')
+        self.assertFalse(CustomUser.objects.filter(username='nuevo').exists())
+        self.sync_replicas()
+        self.assertTrue(CustomUser.objects.filter(username='nuevo').exists())
+
+    def test_read_after_write_in_request_uses_primary(self):
+        def view(request):
+            CustomUser.objects.create(username='nuevo')
+            return CustomUser.objects.filter(username='nuevo').exists()
+
+        middleware = ReplicaPinningMiddleware(view)
+        self.assertTrue(middleware(RequestFactory().get('/')))
+        # Terminado el request, las lecturas vuelven a la réplica.
+        self.assertFalse(CustomUser.objects.filter(username='nuevo').exists())
+
+    def test_api_list_reads_from_replica(self):
+        user = CustomUser.objects.create(username='conductor', is_driver=True)
+        self.sync_replicas()
+        CustomUser.objects.create(username='sin_replicar', is_driver=True)
+
+        self.client.force_login(user)
+        response = self.client.get('/api/drivers/')
+
+        self.assertEqual(response.status_code, 200)
+        usernames = {driver['username'] for driver in response.json()}
+        self.assertIn('conductor', usernames)
+        self.assertNotIn('sin_replicar', usernames)
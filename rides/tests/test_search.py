@@ -0,0 +1,131 @@
+from unittest import mock
+
+from django.db import connections
+from django.test import TestCase
+
+from rides.models import CustomUser, Rating, Trip, Vehicle
+from rides.search import icontains_ids, search_ids
+from rides.views import SearchView
+
+
+class SearchIndexTests(TestCase):
+
+    def setUp(self):
+        self.passenger = CustomUser.objects.create(
+            username='pasajero', first_name='Zoraida', last_name='Quintero',
+            email='zoraida@example.com',
+        )
+        self.driver = CustomUser.objects.create(
+            username='conductor', first_name='Wilmer', email='wilmer@example.com',
+            is_driver=True,
+        )
+        self.vehicle = Vehicle.objects.create(
+            driver=self.driver, license_plate='QXZ123', model='Kia Picanto'
+        )
+
+    def rate(self, comment, score=5):
+        trip = Trip.objects.create(passenger=self.passenger, driver=self.driver)
+        return Rating.objects.create(trip=trip, score=score, comment=comment)
+
+    def test_rating_comments_stay_in_sync(self):
+        rating = self.rate('Conductor amabilísimo')
+        self.assertEqual(search_ids(Rating, 'amabilisimo'), [rating.pk])
+
+        rating.comment = 'Llegó tardísimo'
+        rating.save()
+        self.assertEqual(search_ids(Rating, 'amabilisimo'), [])
+        self.assertEqual(search_ids(Rating, 'tardisimo'), [rating.pk])
+
+        rating.delete()
+        self.assertEqual(search_ids(Rating, 'tardisimo'), [])
+
+    def test_user_fields_stay_in_sync(self):
+        for query in ('zorai', 'quinter', 'pasajer', 'zoraida@example'):
+            with self.subTest(query=query):
+                self.assertEqual(search_ids(CustomUser, query), [self.passenger.pk])
+
+        self.passenger.last_name = 'Ybarra'
+        self.passenger.save()
+        self.assertEqual(search_ids(CustomUser, 'quinter'), [])
+        self.assertEqual(search_ids(CustomUser, 'ybarr'), [self.passenger.pk])
+
+        self.passenger.delete()
+        self.assertEqual(search_ids(CustomUser, 'ybarr'), [])
+
+    def test_license_plates_stay_in_sync(self):
+        self.assertEqual(search_ids(Vehicle, 'qxz'), [self.vehicle.pk])
+
+        self.vehicle.license_plate = 'JJW987'
+        self.vehicle.save()
+        self.assertEqual(search_ids(Vehicle, 'qxz'), [])
+        self.assertEqual(search_ids(Vehicle, 'jjw9'), [self.vehicle.pk])
+
+        self.vehicle.delete()
+        self.assertEqual(search_ids(Vehicle, 'jjw9'), [])
+
+    def test_every_term_must_match_as_prefix(self):
+        both = self.rate('Conductor amable y puntual')
+        self.rate('Conductor amable')
+        self.assertEqual(search_ids(Rating, 'amab punt'), [both.pk])
+        self.assertEqual(search_ids(CustomUser, 'zor quin'), [self.passenger.pk])
+
+    def test_results_are_ordered_by_relevance(self):
+        weak = self.rate('puntual, aunque el viaje fue largo, lento y con mucho tráfico')
+        strong = self.rate('puntual puntual puntual')
+        self.assertEqual(search_ids(Rating, 'puntual'), [strong.pk, weak.pk])
+
+    def test_limit(self):
+        for _ in range(3):
+            self.rate('excelente')
+        self.assertEqual(len(search_ids(Rating, 'excelente', limit=2)), 2)
+
+    def test_icontains_fallback(self):
+        both = self.rate('Conductor amable y puntual')
+        self.rate('Conductor amable')
+        self.assertEqual(icontains_ids(Rating, ['amab', 'punt'], 20), [both.pk])
+        self.assertEqual(icontains_ids(CustomUser, ['oraid'], 20), [self.passenger.pk])
+
+    def test_other_backends_use_icontains(self):
+        with mock.patch.object(connections['default'], 'vendor', 'oracle'), \
+                mock.patch('rides.search.icontains_ids', return_value=[7]) as fallback:
+            self.assertEqual(search_ids(Rating, 'Amab'), [7])
+        fallback.assert_called_once_with(Rating, ['amab'], 20, using='default')
+
+
+class SearchViewTests(TestCase):
+
+    def setUp(self):
+        self.staff = CustomUser.objects.create(username='soporte', is_staff=True)
+        self.passenger = CustomUser.objects.create(username='pasajero')
+        for _ in range(3):
+            trip = Trip.objects.create(passenger=self.passenger)
+            Rating.objects.create(trip=trip, score=5, comment='excelente servicio')
+        self.client.force_login(self.staff)
+
+    def search(self, **params):
+        response = self.client.get('/api/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_returns_each_kind(self):
+        data = self.search(q='excel')
+        self.assertEqual(len(data['ratings']), 3)
+        self.assertEqual(data['ratings'][0]['comment'], 'excelente servicio')
+        self.assertEqual(self.search(q='pasaj')['users'][0]['username'], 'pasajero')
+
+    def test_empty_or_punctuation_query(self):
+        for q in ('', '"', '*', '" * ( ) :'):
+            with self.subTest(q=q):
+                self.assertEqual(
+                    self.search(q=q), {'ratings': [], 'users': [], 'vehicles': []}
+                )
+
+    def test_limit_is_clamped(self):
+        self.assertEqual(len(self.search(q='excel', limit=0)['ratings']), 1)
+        self.assertEqual(len(self.search(q='excel', limit='muchos')['ratings']), 3)
+        with mock.patch.object(SearchView, 'max_limit', 2):
+            self.assertEqual(len(self.search(q='excel', limit=50)['ratings']), 2)
+
+    def test_staff_only(self):
+        self.client.force_login(self.passenger)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'excel'}).status_code, 403)
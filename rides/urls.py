@@ -6,6 +6,7 @@ from .views import (
     TripViewSet,
     DriverViewSet,
     RatingViewSet,
+    SearchView,
     HomeView
 )
 
@@ -17,5 +18,6 @@ router.register(r'ratings', RatingViewSet, basename='rating')
 
 urlpatterns = [
     path('', HomeView.as_view(), name='home'),
+    path('api/search/', SearchView.as_view(), name='search'),
     path('api/', include(router.urls)),
 ]
@@ -1,9 +1,15 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.views.generic import TemplateView
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins, permissions, viewsets
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 
+from .cache import list_coalescer
 from .models import Rating, Trip, Vehicle
+from .search import search
 from .serializers import (
     RatingSerializer,
     TripSerializer,
@@ -21,29 +27,89 @@ class HomeView(TemplateView):
     template_name = 'rides/home.html'
 
 
-class VehicleViewSet(viewsets.ModelViewSet):
+class CoalescedListMixin:
+    """
+    Comparte el resultado de `list()` entre requests GET idénticos y
+    concurrentes (ver `rides.cache.SingleFlight`).
+
+    La clave es la ruta con los parámetros ordenados, el formato de respuesta
+    y el alcance de permisos del usuario (`coalesce_scope`). Las escrituras en
+    los modelos de rides descartan los listados guardados (ver signals.py).
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not settings.RIDES_COALESCE_LISTS:
+            return super().list(request, *args, **kwargs)
+        data = list_coalescer.do(
+            self.coalesce_key(request),
+            lambda: super(CoalescedListMixin, self).list(request, *args, **kwargs).data,
+        )
+        return Response(data)
+
+    def coalesce_key(self, request):
+        params = tuple(
+            (name, tuple(request.query_params.getlist(name)))
+            for name in sorted(self.coalesce_params())
+            if name in request.query_params
+        )
+        return (
+            request.path,
+            params,
+            request.accepted_renderer.format,
+            self.coalesce_scope(request),
+        )
+
+    def coalesce_params(self):
+        """
+        Parámetros de la query que cambian el resultado; el resto se ignora
+        para que `?x=1`, `?x=2`... compartan la misma entrada.
+        """
+        names = {api_settings.URL_FORMAT_OVERRIDE}
+        for backend_class in self.filter_backends:
+            backend = backend_class()
+            if hasattr(backend, 'get_filterset_class'):
+                filterset_class = backend.get_filterset_class(self, self.get_queryset())
+                if filterset_class is not None:
+                    names.update(filterset_class.base_filters)
+            for attr in ('search_param', 'ordering_param'):
+                names.add(getattr(backend, attr, None))
+        if self.paginator is not None:
+            for attr in ('page_query_param', 'page_size_query_param',
+                         'limit_query_param', 'offset_query_param',
+                         'cursor_query_param'):
+                names.add(getattr(self.paginator, attr, None))
+        names.discard(None)
+        return names
+
+    def coalesce_scope(self, request):
+        # Ningún listado filtra por usuario: basta con el nivel de permisos.
+        user = request.user
+        return (user.is_authenticated, user.is_staff, user.is_superuser)
+
+
+class VehicleViewSet(CoalescedListMixin, viewsets.ModelViewSet):
     """
     ViewSet para CRUD de vehículos.
     """
-    queryset = Vehicle.objects.all()
+    queryset = Vehicle.objects.select_related('driver')
     serializer_class = VehicleSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
-class TripViewSet(viewsets.ReadOnlyModelViewSet):
+class TripViewSet(CoalescedListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet para gestionar trips.
 
     Soporta filtro por driver con ?driver=<id>.
     """
-    queryset = Trip.objects.all()
+    queryset = Trip.objects.select_related('passenger', 'driver', 'rating')
     serializer_class = TripSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['driver']
 
 
-class DriverViewSet(viewsets.ReadOnlyModelViewSet):
+class DriverViewSet(CoalescedListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet para ver conductores.
     """
@@ -53,6 +119,7 @@ class DriverViewSet(viewsets.ReadOnlyModelViewSet):
 
 
 class RatingViewSet(
+    CoalescedListMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
@@ -64,3 +131,35 @@ class RatingViewSet(
     queryset = Rating.objects.all()
     serializer_class = RatingSerializer
     permission_classes = [permissions.IsAuthenticated]
+
+
+class SearchView(APIView):
+    """
+    Búsqueda de texto completo sobre comentarios de ratings, usuarios
+    (username, nombres, email) y placas de vehículos.
+
+    ?q=<texto> (cada término se busca como prefijo), ?limit=<n> por tipo.
+    Los resultados de cada tipo vienen ordenados por relevancia. Sólo para
+    staff: expone nombres y emails de todos los usuarios.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    max_limit = 100
+
+    def get(self, request):
+        text = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            limit = 20
+        limit = max(1, min(limit, self.max_limit))
+
+        ratings = search(Rating, text, limit)
+        users = search(User, text, limit)
+        vehicles = search(
+            Vehicle, text, limit, queryset=Vehicle.objects.select_related('driver')
+        )
+        return Response({
+            'ratings': RatingSerializer(ratings, many=True).data,
+            'users': UserSerializer(users, many=True).data,
+            'vehicles': VehicleSerializer(vehicles, many=True).data,
+        })
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'rides.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -79,9 +81,35 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Archivo (no memoria) para poder copiarlo a las réplicas de prueba.
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
+# Réplicas de solo lectura (ver rides/routers.py), desactivadas por defecto:
+# DJANGO_DB_REPLICAS=N las activa. SQLite no replica, así que en desarrollo
+# cada réplica es otra conexión sobre DJANGO_DB_REPLICA_NAME (por defecto el
+# mismo archivo de 'default') y no ve las escrituras sin confirmar.
+# En pruebas cada réplica es un archivo propio y siempre se define al menos
+# una: el runner de pruebas (rides.test_runner) envía todo a 'default', y
+# sólo rides.tests.test_routers.ReplicaTransactionTestCase activa las
+# réplicas y copia en ellas la base de 'default' cuando la prueba lo pide.
+DATABASE_REPLICA_COUNT = int(os.environ.get('DJANGO_DB_REPLICAS', '0'))
+DATABASE_REPLICAS = [f'replica_{i}' for i in range(1, DATABASE_REPLICA_COUNT + 1)]
+
+for i in range(1, max(DATABASE_REPLICA_COUNT, 1) + 1):
+    alias = f'replica_{i}'
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('DJANGO_DB_REPLICA_NAME', BASE_DIR / 'db.sqlite3'),
+        # Su contenido se copia desde 'default': basta con crear las tablas.
+        'TEST': {'NAME': BASE_DIR / f'test_db_{alias}.sqlite3', 'MIGRATE': False},
+    }
+
+DATABASE_ROUTERS = ['rides.routers.PrimaryReplicaRouter']
+
+TEST_RUNNER = 'rides.test_runner.PrimaryOnlyTestRunner'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -125,3 +153,16 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'rides.CustomUser'
+
+# Máximo de representaciones serializadas en rides.cache.fragment_cache
+# (por proceso).
+RIDES_FRAGMENT_CACHE_SIZE = 10000
+
+# Coalescencia de listados GET idénticos (rides.views.CoalescedListMixin):
+# los requests concurrentes con la misma URL y alcance de permisos comparten
+# una sola consulta, y su resultado se reutiliza durante RIDES_COALESCE_TTL
+# segundos (o hasta la siguiente escritura en los modelos de rides). Se
+# guardan como mucho RIDES_COALESCE_MAX_ENTRIES listados.
+RIDES_COALESCE_LISTS = True
+RIDES_COALESCE_TTL = 0.5
+RIDES_COALESCE_MAX_ENTRIES = 256